@@ -2,15 +2,67 @@ from fastapi import FastAPI, HTTPException, Depends, status, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.models import MovieModel, UserModel, RentalModel, UserCreate, UserUpdate
+from app.models import MovieModel, MovieSuggestion, UserModel, RentalModel, UserCreate, UserUpdate
+from app.suggest import SuggestionIndex
 from app.auth import get_password_hash, verify_password, create_access_token, SECRET_KEY, ALGORITHM
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from typing import List, Optional
 from bson import ObjectId
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
 
-app = FastAPI(title="FilmRent - Wypożyczalnia Filmów API")
+logger = logging.getLogger(__name__)
+
+# --- BAZA DANYCH ---
+MONGO_URL = os.getenv("MONGODB_URL", "mongodb://mongo:27017")
+DB_NAME = os.getenv("DB_NAME", "wypozyczalnia_db")
+client = AsyncIOMotorClient(MONGO_URL)
+db = client[DB_NAME]
+
+# --- INDEKS PODPOWIEDZI ---
+# Indeks żyje tylko w pamięci tego procesu. add/update/delete_movie aktualizują go
+# od razu, ale zmiany z innych instancji Cloud Run albo z seeds.py (który wrzuca
+# filmy prosto do bazy) dotrą tu dopiero przy okresowej przebudowie w tle (co SUGGEST_TTL_SECONDS).
+suggestion_index = SuggestionIndex()
+SUGGEST_TTL_SECONDS = int(os.getenv("SUGGEST_TTL_SECONDS", "300"))
+SUGGEST_RETRY_SECONDS = 30     # odstęp między próbami, gdy baza nie odpowiada
+SUGGEST_LOAD_TIMEOUT = 5       # indeks nie może blokować startu na długo
+SUGGEST_REBUILD_ATTEMPTS = 3   # ile razy ponawiamy odczyt, gdy w trakcie zmieniły się filmy
+
+async def refresh_suggestion_index() -> bool:
+    try:
+        for _ in range(SUGGEST_REBUILD_ATTEMPTS):
+            # add/remove w trakcie odczytu zmieniają wersję - wtedy snapshot z bazy
+            # mógłby je nadpisać, więc czytamy jeszcze raz
+            version = suggestion_index.version
+            cursor = db.movies.find({}, {"title": 1, "director": 1, "actors": 1})
+            movies = await asyncio.wait_for(cursor.to_list(None), SUGGEST_LOAD_TIMEOUT)
+            if suggestion_index.version == version:
+                suggestion_index.rebuild(movies)
+                return True
+        logger.warning("Indeks podpowiedzi nie przebudowany - filmy zmieniały się w trakcie odczytu")
+    except Exception as e:
+        logger.warning("Nie udało się zbudować indeksu podpowiedzi: %r", e)
+    return False
+
+async def refresh_suggestion_index_forever(loaded: bool):
+    # Przebudowa w tle: co SUGGEST_TTL_SECONDS, a po nieudanej próbie co SUGGEST_RETRY_SECONDS
+    while True:
+        await asyncio.sleep(SUGGEST_TTL_SECONDS if loaded else SUGGEST_RETRY_SECONDS)
+        loaded = await refresh_suggestion_index()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Brak bazy przy starcie nie blokuje API - indeks dobuduje się w tle
+    loaded = await refresh_suggestion_index()
+    refresher = asyncio.create_task(refresh_suggestion_index_forever(loaded))
+    yield
+    refresher.cancel()
+
+app = FastAPI(title="FilmRent - Wypożyczalnia Filmów API", lifespan=lifespan)
 
 # --- CORS ---
 app.add_middleware(
@@ -24,12 +76,6 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# --- BAZA DANYCH ---
-MONGO_URL = os.getenv("MONGODB_URL", "mongodb://mongo:27017")
-DB_NAME = os.getenv("DB_NAME", "wypozyczalnia_db")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
-
 # --- ENDPOINT TESTOWY (Health Check) ---
 @app.get("/")
 async def root():
@@ -115,6 +161,14 @@ async def get_movies(search: Optional[str] = None, sort_by: Optional[str] = "tit
 
     return await cursor.to_list(100)
 
+@app.get("/movies/suggest", response_model=List[MovieSuggestion])
+async def suggest_movies(
+    q: str = Query(..., min_length=SuggestionIndex.MIN_PREFIX),
+    limit: int = Query(10, ge=1, le=50)
+):
+    # Autouzupełnianie wyłącznie z pamięci - bez zapytania do bazy
+    return suggestion_index.search(q, limit)
+
 @app.post("/movies", response_model=MovieModel)
 async def add_movie(movie: MovieModel, _: dict = Depends(get_admin_user)):
     # Sprawdzenie czy film o takim tytule już istnieje
@@ -123,7 +177,9 @@ async def add_movie(movie: MovieModel, _: dict = Depends(get_admin_user)):
         raise HTTPException(status_code=400, detail=f"Film '{movie.title}' już istnieje w bazie danych!")
     
     new_movie = await db.movies.insert_one(movie.model_dump(by_alias=True, exclude=["id"]))
-    return await db.movies.find_one({"_id": new_movie.inserted_id})
+    created = await db.movies.find_one({"_id": new_movie.inserted_id})
+    suggestion_index.add(created)
+    return created
 
 @app.put("/movies/{movie_id}")
 async def update_movie(movie_id: str, movie_update: dict, _: dict = Depends(get_admin_user)):
@@ -134,6 +190,10 @@ async def update_movie(movie_id: str, movie_update: dict, _: dict = Depends(get_
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Film nie istnieje")
+
+    updated = await db.movies.find_one({"_id": ObjectId(movie_id)})
+    if updated:
+        suggestion_index.add(updated)
     return {"message": "Zaktualizowano"}
 
 @app.delete("/movies/{movie_id}")
@@ -142,6 +202,7 @@ async def delete_movie(movie_id: str, _: dict = Depends(get_admin_user)):
         raise HTTPException(status_code=400, detail="Nie można usunąć wypożyczonego filmu!")
 
     await db.movies.delete_one({"_id": ObjectId(movie_id)})
+    suggestion_index.remove(movie_id)
     return {"message": "Film usunięty"}
 
 # ==========================================
@@ -20,6 +20,14 @@ class MovieModel(BaseModel):
     
     model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
+# --- MODEL PODPOWIEDZI WYSZUKIWARKI (tylko ID i tekst do wyświetlenia) ---
+class MovieSuggestion(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    field: str   # title / director / actors
+    text: str
+
+    model_config = ConfigDict(populate_by_name=True)
+
 # --- MODEL REJESTRACJI (Poprawka: dodano adres, telefon) ---
 class UserCreate(BaseModel):
     email: EmailStr
@@ -0,0 +1,104 @@
+import bisect
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Znaki, których NFKD nie rozkłada na literę + akcent
+_EXTRA_FOLD = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "ß": "ss"})
+
+def normalize(text: str) -> str:
+    # "Żółć Łódź" -> "zolc lodz"
+    text = (text or "").lower().translate(_EXTRA_FOLD)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+# --- INDEKS PODPOWIEDZI (posortowana tablica kluczy w pamięci) ---
+class SuggestionIndex:
+    """
+    Indeks prefiksowy dla autouzupełniania wyszukiwarki filmów.
+    Kluczami są znormalizowane tytuły, reżyserzy i aktorzy - od początku
+    tekstu oraz od każdego kolejnego słowa ("Ojciec chrzestny" znajdziemy
+    zarówno po "ojc", jak i po "chrz"). Wyszukiwanie to bisect po tablicy,
+    bez zapytań do bazy. Każdy film zwraca jedną, najlepiej pasującą podpowiedź:
+    najpierw dopasowanie od początku tekstu, potem tytuł > reżyser > aktor.
+    """
+
+    FIELDS = ("title", "director", "actors")
+    MIN_PREFIX = 2   # jedna litera pasowałaby do większości katalogu
+
+    def __init__(self):
+        # (klucz, movie_id, pole, tekst do wyświetlenia, nr słowa, od którego zaczyna się klucz)
+        self._entries: List[Tuple[str, str, str, str, int]] = []
+        self._by_movie: Dict[str, List[Tuple[str, str, str, str, int]]] = {}
+        self.built_at: Optional[float] = None
+        self.version = 0   # rośnie przy każdym add/remove
+
+    def __len__(self):
+        return len(self._by_movie)
+
+    def _entries_for(self, movie: dict) -> List[Tuple[str, str, str, str, int]]:
+        movie_id = str(movie["_id"])
+        entries = set()
+        for field in self.FIELDS:
+            values = movie.get(field) or []
+            if not isinstance(values, list):
+                values = [values]
+            for label in values:
+                # update_movie przyjmuje dowolny dict, więc w bazie może trafić się np. liczba
+                if not isinstance(label, str):
+                    continue
+                words = normalize(label).split(" ")
+                for i in range(len(words)):
+                    key = " ".join(words[i:])
+                    if key:
+                        entries.add((key, movie_id, field, label, i))
+        return sorted(entries)
+
+    def rebuild(self, movies: Iterable[dict]):
+        self._entries = []
+        self._by_movie = {}
+        for movie in movies:
+            entries = self._entries_for(movie)
+            self._by_movie[str(movie["_id"])] = entries
+            self._entries.extend(entries)
+        self._entries.sort()
+        self.built_at = time.monotonic()
+
+    def add(self, movie: dict):
+        self.remove(movie["_id"])
+        entries = self._entries_for(movie)
+        self._by_movie[str(movie["_id"])] = entries
+        for entry in entries:
+            bisect.insort(self._entries, entry)
+
+    def remove(self, movie_id):
+        self.version += 1
+        for entry in self._by_movie.pop(str(movie_id), []):
+            i = bisect.bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    def search(self, q: str, limit: int = 10) -> List[dict]:
+        prefix = normalize(q)
+        if len(prefix) < self.MIN_PREFIX:
+            return []
+
+        # Najlepsze dopasowanie dla każdego filmu
+        best: Dict[str, tuple] = {}
+        i = bisect.bisect_left(self._entries, (prefix,))
+        while i < len(self._entries):
+            key, movie_id, field, label, word = self._entries[i]
+            if not key.startswith(prefix):
+                break
+            rank = (word > 0, self.FIELDS.index(field), key, label)
+            if movie_id not in best or rank < best[movie_id][0]:
+                best[movie_id] = (rank, field, label)
+            i += 1
+
+        ranked = sorted(best.items(), key=lambda item: item[1][0])
+        return [
+            {"_id": movie_id, "field": field, "text": label}
+            for movie_id, (_, field, label) in ranked[:limit]
+        ]
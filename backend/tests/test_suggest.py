@@ -0,0 +1,227 @@
+import asyncio
+import re
+import time
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo.errors import ServerSelectionTimeoutError
+import app.main as main
+from app.main import app, get_admin_user
+from app.suggest import SuggestionIndex, normalize
+
+MOVIES = [
+    {"_id": "m1", "title": "Ojciec chrzestny", "director": "Francis Ford Coppola", "actors": ["Marlon Brando", "Al Pacino"]},
+    {"_id": "m2", "title": "Dwunastu gniewnych ludzi", "director": "Sidney Lumet", "actors": ["Henry Fonda"]},
+    {"_id": "m3", "title": "Żółć Łodzi", "director": "Jan Kowalski", "actors": []},
+]
+
+# --- Atrapa kolekcji Mongo (tylko to, czego używają endpointy filmów) ---
+def _matches(doc, query):
+    for key, value in query.items():
+        if isinstance(value, dict) and "$regex" in value:
+            flags = re.I if "i" in value.get("$options", "") else 0
+            if not re.search(value["$regex"], str(doc.get(key, "")), flags):
+                return False
+        elif doc.get(key) != value:
+            return False
+    return True
+
+class FakeResult:
+    def __init__(self, inserted_id=None, matched_count=0):
+        self.inserted_id = inserted_id
+        self.matched_count = matched_count
+
+class FakeCursor:
+    def __init__(self, docs, error=None):
+        self.docs = docs
+        self.error = error
+
+    async def to_list(self, length):
+        if self.error:
+            raise self.error
+        return [dict(d) for d in self.docs]
+
+class FakeCollection:
+    def __init__(self, docs=(), error=None):
+        self.docs = [dict(d) for d in docs]
+        self.error = error
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([d for d in self.docs if _matches(d, query or {})], self.error)
+
+    async def find_one(self, query):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def insert_one(self, doc):
+        doc = dict(doc, _id=ObjectId())
+        self.docs.append(doc)
+        return FakeResult(inserted_id=doc["_id"])
+
+    async def update_one(self, query, update):
+        for d in self.docs:
+            if _matches(d, query):
+                d.update(update["$set"])
+                return FakeResult(matched_count=1)
+        return FakeResult()
+
+    async def delete_one(self, query):
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+class SlowCollection(FakeCollection):
+    # Pierwszy odczyt czeka na `gate` i zwraca stan z chwili wywołania find()
+    def __init__(self, docs=()):
+        super().__init__(docs)
+        self.gate = asyncio.Event()
+        self.reads = 0
+
+    def find(self, query=None, projection=None):
+        cursor = super().find(query, projection)
+        self.reads += 1
+        if self.reads == 1:
+            to_list = cursor.to_list
+            async def slow_to_list(length):
+                await self.gate.wait()
+                return await to_list(length)
+            cursor.to_list = slow_to_list
+        return cursor
+
+class FakeDB:
+    def __init__(self, movies=(), error=None):
+        self.movies = FakeCollection(movies, error)
+        self.rentals = FakeCollection()
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(main, "suggestion_index", SuggestionIndex())
+    app.dependency_overrides[get_admin_user] = lambda: {"role": "admin"}
+    yield
+    app.dependency_overrides.clear()
+
+def suggest(c, q):
+    response = c.get("/movies/suggest", params={"q": q})
+    assert response.status_code == 200
+    return response.json()
+
+# --- Indeks ---
+def test_normalize_strips_polish_diacritics():
+    assert normalize("  Żółć   ŁÓDŹ ") == "zolc lodz"
+
+def test_search_matches_prefix_of_any_word():
+    index = SuggestionIndex()
+    index.rebuild(MOVIES)
+
+    assert [s["_id"] for s in index.search("chrz")] == ["m1"]
+    assert index.search("pacino") == [{"_id": "m1", "field": "actors", "text": "Al Pacino"}]
+    assert index.search("lodz")[0]["text"] == "Żółć Łodzi"
+    assert index.search("   ") == []
+    assert index.search("o") == []
+
+def test_search_ranks_title_first_and_returns_one_row_per_movie():
+    movies = [
+        {"_id": f"a{n}", "title": "Ala", "director": "Al Bo", "actors": [f"Al {i}" for i in range(12)]}
+        for n in range(3)
+    ]
+    movies.append({"_id": "b", "title": "Krótki film", "director": "X", "actors": ["Alan Rickman"]})
+    index = SuggestionIndex()
+    index.rebuild(movies)
+
+    results = index.search("al", 10)
+    assert [r["_id"] for r in results] == ["a0", "a1", "a2", "b"]
+    assert [r["field"] for r in results] == ["title", "title", "title", "actors"]
+    assert len(index.search("al", 2)) == 2
+
+def test_non_string_fields_are_skipped():
+    index = SuggestionIndex()
+    index.rebuild([{"_id": "m1", "title": "Film", "director": 55, "actors": [1, None, "Anna Nowak"]}])
+    index.add({"_id": "m2", "title": 7, "director": ["Jan"], "actors": 3})
+
+    assert index.search("anna") == [{"_id": "m1", "field": "actors", "text": "Anna Nowak"}]
+    assert index.search("jan") == [{"_id": "m2", "field": "director", "text": "Jan"}]
+    assert index.search("55") == []
+
+def test_add_and_remove():
+    index = SuggestionIndex()
+    index.rebuild(MOVIES)
+
+    index.add({"_id": "m2", "title": "Dwunastu", "director": "Sidney Lumet", "actors": []})
+    assert index.search("gniew") == []
+    assert index.search("henry") == []
+
+    index.remove("m1")
+    assert index.search("ojciec") == []
+    assert len(index) == 2
+
+@pytest.mark.asyncio
+async def test_refresh_does_not_overwrite_changes_made_while_loading(monkeypatch):
+    movies = MOVIES + [{"_id": "ghost", "title": "Ghost", "director": "Jerry Zucker", "actors": []}]
+    index = SuggestionIndex()
+    index.rebuild(movies)
+    fake_db = FakeDB()
+    fake_db.movies = SlowCollection(movies)
+    monkeypatch.setattr(main, "suggestion_index", index)
+    monkeypatch.setattr(main, "db", fake_db)
+
+    refresh = asyncio.create_task(main.refresh_suggestion_index())
+    await asyncio.sleep(0)
+
+    # delete_movie w trakcie odczytu: najpierw baza, potem indeks
+    await fake_db.movies.delete_one({"_id": "ghost"})
+    index.remove("ghost")
+    fake_db.movies.gate.set()
+
+    assert await refresh is True
+    assert fake_db.movies.reads == 2
+    assert index.search("gho") == []
+    assert [s["_id"] for s in index.search("ojc")] == ["m1"]
+
+# --- Endpointy ---
+def test_index_built_at_startup(monkeypatch, fresh_index):
+    monkeypatch.setattr(main, "db", FakeDB(MOVIES))
+    with TestClient(app) as c:
+        assert main.suggestion_index.built_at is not None
+
+        # /movies/suggest nie dotyka bazy
+        monkeypatch.setattr(main, "db", None)
+        assert suggest(c, "Fra") == [{"_id": "m1", "field": "director", "text": "Francis Ford Coppola"}]
+
+def test_suggest_requires_min_prefix(monkeypatch, fresh_index):
+    monkeypatch.setattr(main, "db", FakeDB(MOVIES))
+    with TestClient(app) as c:
+        assert c.get("/movies/suggest", params={"q": "o"}).status_code == 422
+        assert c.get("/movies/suggest").status_code == 422
+
+def test_startup_without_database(monkeypatch, fresh_index):
+    monkeypatch.setattr(main, "db", FakeDB(error=ServerSelectionTimeoutError("brak bazy")))
+    monkeypatch.setattr(main, "SUGGEST_RETRY_SECONDS", 0.01)
+    with TestClient(app) as c:
+        assert c.get("/").status_code == 200
+        assert suggest(c, "ojc") == []
+        assert main.suggestion_index.built_at is None
+
+        # Baza wróciła - indeks dobudowuje się w tle
+        monkeypatch.setattr(main, "db", FakeDB(MOVIES))
+        deadline = time.monotonic() + 2
+        while main.suggestion_index.built_at is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [s["_id"] for s in suggest(c, "ojc")] == ["m1"]
+
+def test_movie_endpoints_keep_index_in_sync(monkeypatch, fresh_index):
+    monkeypatch.setattr(main, "db", FakeDB())
+    with TestClient(app) as c:
+        payload = {"title": "Pulp Fiction", "genre": "Kryminał", "director": "Quentin Tarantino",
+                   "duration_minutes": 154, "rating": 8.3, "description": "...", "actors": ["John Travolta"]}
+        response = c.post("/movies", json=payload)
+        assert response.status_code == 200
+        movie_id = response.json()["_id"]
+        assert suggest(c, "pulp") == [{"_id": movie_id, "field": "title", "text": "Pulp Fiction"}]
+
+        response = c.put(f"/movies/{movie_id}", json={"title": "Wściekłe psy", "director": 5})
+        assert response.status_code == 200
+        assert suggest(c, "pulp") == []
+        assert suggest(c, "quentin") == []
+        assert suggest(c, "psy") == [{"_id": movie_id, "field": "title", "text": "Wściekłe psy"}]
+
+        response = c.delete(f"/movies/{movie_id}")
+        assert response.status_code == 200
+        assert suggest(c, "wsciekle") == []
+        assert suggest(c, "travolta") == []